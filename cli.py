@@ -4,9 +4,11 @@ import json
 import sys
 from pathlib import Path
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime, time
 
 from core.document_processor import DocumentProcessor, DocumentType
+from core.exporter import ResultExporter
+from core.scheduler import Job, JobScheduler, TokenBudget, estimate_document_tokens
 from core.validator import Resume, DrivingLicense, ShopReceipt
 
 
@@ -30,10 +32,12 @@ class CustomPromptProcessor:
 
 
 class DocumentProcessorCLI:
-    def __init__(self):
-        self.processor = DocumentProcessor()
+    def __init__(self, stream: bool = False, preprocess: bool = True, export_format: str = 'json'):
+        self.processor = DocumentProcessor(stream=stream, preprocess=preprocess)
+        self.export_format = export_format
         self.output_dir = Path("outputs")
         self.output_dir.mkdir(exist_ok=True)
+        self._prompt_cache = {}
         
         self.validator_map = {
             DocumentType.RESUME: Resume,
@@ -64,10 +68,26 @@ class DocumentProcessorCLI:
         validator_class = self.validator_map[document_type]
         custom_prompt_processor = CustomPromptProcessor(custom_prompt_path, validator_class)
         
-        self.processor.document_configs[document_type]['prompt_func'] = custom_prompt_processor.get_prompt
+        return custom_prompt_processor.get_prompt
+    
+    def _avg_time_to_first_field(self, results: List[dict]) -> Optional[float]:
+        timings = [r['time_to_first_field'] for r in results if r.get('time_to_first_field') is not None]
+        if not timings:
+            return None
+        return round(sum(timings) / len(timings), 3)
+    
+    def _unique_base_name(self, base_name: str) -> str:
+        """Append a counter when a same-second run of another job already used this name"""
+        candidate = base_name
+        counter = 2
+        while (self.output_dir / candidate).exists() or (self.output_dir / f"{candidate}.json").exists():
+            candidate = f"{base_name}_{counter}"
+            counter += 1
+        return candidate
     
     def _save_results(self, results: List[dict], document_type: DocumentType, 
-                     dataset_name: str, custom_prompt_name: Optional[str] = None) -> str:
+                     dataset_name: str, custom_prompt_name: Optional[str] = None,
+                     remaining_files: int = 0) -> str:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         filename_parts = [
@@ -79,8 +99,13 @@ class DocumentProcessorCLI:
         if custom_prompt_name:
             filename_parts.insert(-1, f"custom_{custom_prompt_name}")
         
-        filename = "_".join(filename_parts) + ".json"
-        output_path = self.output_dir / filename
+        base_name = self._unique_base_name("_".join(filename_parts))
+        
+        tables = None
+        if self.export_format != 'json':
+            # Columnar export validates the batch first, which may mark results as failed
+            exporter = ResultExporter(self.validator_map[document_type], export_format=self.export_format)
+            tables = exporter.export(results, self.output_dir / base_name)
         
         summary = {
             "processing_summary": {
@@ -91,21 +116,50 @@ class DocumentProcessorCLI:
                 "failed_extractions": sum(1 for r in results if not r.get("success", False)),
                 "timestamp": timestamp,
                 "custom_prompt_used": custom_prompt_name is not None,
-                "custom_prompt_name": custom_prompt_name
-            },
-            "results": results
+                "custom_prompt_name": custom_prompt_name,
+                "streaming": self.processor.stream,
+                "avg_time_to_first_field": self._avg_time_to_first_field(results),
+                "remaining_files": remaining_files
+            }
         }
         
+        if tables is not None:
+            summary["export_format"] = self.export_format
+            summary["tables"] = tables
+            output_path = self.output_dir / base_name / "summary.json"
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2, ensure_ascii=False)
+            return str(output_path.parent)
+        
+        summary["results"] = results
+        output_path = self.output_dir / f"{base_name}.json"
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(summary, f, indent=2, ensure_ascii=False)
         
         return str(output_path)
     
-    def process_dataset(self, document_type_str: str, dataset_dir: str, 
-                       custom_prompt_path: Optional[str] = None) -> str:
+    def _parse_deadline(self, deadline) -> Optional[datetime]:
+        """Accept ISO strings or the datetime/date values PyYAML produces, as naive local time"""
+        if deadline is None:
+            return None
+        if isinstance(deadline, str):
+            deadline = datetime.fromisoformat(deadline)
+        elif isinstance(deadline, date) and not isinstance(deadline, datetime):
+            deadline = datetime.combine(deadline, time.min)
+        elif not isinstance(deadline, datetime):
+            raise ValueError(f"Invalid deadline {deadline!r}; expected an ISO date or datetime")
         
+        # Sorting mixed aware and naive datetimes raises, so convert aware ones to local time
+        if deadline.tzinfo is not None:
+            deadline = deadline.astimezone().replace(tzinfo=None)
+        return deadline
+    
+    def _build_job(self, document_type_str: str, dataset_dir: str,
+                   custom_prompt_path: Optional[str] = None, files: Optional[List[str]] = None,
+                   deadline=None) -> Job:
         document_type = self._get_document_type(document_type_str)
         dataset_path = Path(dataset_dir)
+        deadline = self._parse_deadline(deadline)
         
         if not dataset_path.exists():
             raise FileNotFoundError(f"Dataset directory not found: {dataset_dir}")
@@ -113,72 +167,208 @@ class DocumentProcessorCLI:
         if not dataset_path.is_dir():
             raise ValueError(f"Dataset path is not a directory: {dataset_dir}")
         
+        prompt_func = None
         custom_prompt_name = None
         if custom_prompt_path:
             if not Path(custom_prompt_path).exists():
                 raise FileNotFoundError(f"Custom prompt file not found: {custom_prompt_path}")
             
-            self._setup_custom_prompt(document_type, custom_prompt_path)
+            prompt_func = self._setup_custom_prompt(document_type, custom_prompt_path)
             custom_prompt_name = Path(custom_prompt_path).stem
             print(f"Using custom prompt from: {custom_prompt_path}")
         
-        supported_files = []
-        for file_path in dataset_path.rglob('*'):
-            if file_path.is_file() and self._is_supported_file(str(file_path)):
-                supported_files.append(file_path)
+        if files is not None:
+            supported_files = [Path(f) for f in files if Path(f).is_file()]
+        else:
+            supported_files = []
+            for file_path in dataset_path.rglob('*'):
+                if file_path.is_file() and self._is_supported_file(str(file_path)):
+                    supported_files.append(file_path)
         
-        if not supported_files:
-            print(f"No supported files found in {dataset_dir}")
-            print(f"Supported extensions: {', '.join(self._get_supported_file_extensions())}")
-            return ""
-        
-        print(f"Found {len(supported_files)} supported files to process")
-        print(f"Document type: {document_type.value}")
-        print(f"Processing files...")
+        return Job(
+            name=f"{document_type.value}/{dataset_path.name}",
+            document_type=document_type,
+            files=supported_files,
+            dataset_name=dataset_path.name,
+            prompt_func=prompt_func,
+            custom_prompt_name=custom_prompt_name,
+            deadline=deadline,
+            source={
+                'type': document_type.value,
+                'dataset': dataset_dir,
+                'custom_prompt': custom_prompt_path,
+                'deadline': deadline.isoformat() if deadline else None
+            }
+        )
+    
+    def _process_file(self, job: Job, file_path: Path) -> dict:
+        try:
+            result = self.processor.process_document(job.document_type, str(file_path), prompt_func=job.prompt_func)
+            result['file_path'] = str(file_path)
+            result['file_name'] = file_path.name
+            return result
+        except Exception as e:
+            return {
+                'success': False,
+                'document_type': job.document_type.value,
+                'file_path': str(file_path),
+                'file_name': file_path.name,
+                'error_message': str(e),
+                'raw_response': '',
+                'validated_data': None
+            }
+    
+    def _estimate_tokens(self, job: Job, file_path: Path) -> int:
+        if id(job) not in self._prompt_cache:
+            config = self.processor.document_configs[job.document_type]
+            prompt_func = job.prompt_func or config['prompt_func']
+            self._prompt_cache[id(job)] = prompt_func("") if config['uses_ocr'] else prompt_func()
+        return estimate_document_tokens(file_path, self._prompt_cache[id(job)])
+    
+    def _build_budget(self, tokens_per_minute: Optional[int] = None, daily_spend: Optional[float] = None,
+                      cost_per_million_tokens: Optional[float] = None) -> Optional[TokenBudget]:
+        if tokens_per_minute is None and daily_spend is None:
+            return None
+        return TokenBudget(
+            tokens_per_minute=tokens_per_minute,
+            daily_spend=daily_spend,
+            cost_per_million_tokens=cost_per_million_tokens or 0.0,
+            ledger_path=self.output_dir / "spend_ledger.json"
+        )
+    
+    def _save_remainder(self, scheduler: JobScheduler, remainder: List[tuple]) -> str:
+        """Write unprocessed files as a manifest that a later --manifest run can resume"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = self.output_dir / f"remainder_{timestamp}.json"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(scheduler.remainder_manifest(remainder), f, indent=2, ensure_ascii=False)
         
-        results = []
-        for i, file_path in enumerate(supported_files, 1):
-            print(f"Processing [{i}/{len(supported_files)}]: {file_path.name}")
-            
-            try:
-                result = self.processor.process_document(document_type, str(file_path))
-                result['file_path'] = str(file_path)
-                result['file_name'] = file_path.name
-                results.append(result)
-                
-                status = "✓ SUCCESS" if result.get('success', False) else "✗ FAILED"
-                print(f"  {status}")
-                
-                if not result.get('success', False) and result.get('error_message'):
-                    print(f"    Error: {result['error_message']}")
-                    
-            except Exception as e:
-                error_result = {
-                    'success': False,
-                    'document_type': document_type.value,
-                    'file_path': str(file_path),
-                    'file_name': file_path.name,
-                    'error_message': str(e),
-                    'raw_response': '',
-                    'validated_data': None
-                }
-                results.append(error_result)
-                print(f"  ✗ FAILED - {str(e)}")
-        
-        dataset_name = dataset_path.name
-        output_file = self._save_results(results, document_type, dataset_name, custom_prompt_name)
+        return str(output_path)
+    
+    def _finish_job(self, job: Job) -> str:
+        results = [r for r in job.results if r is not None]
+        remaining = len(job.results) - len(results)
+        output_file = self._save_results(results, job.document_type, job.dataset_name, job.custom_prompt_name, remaining)
         
         successful = sum(1 for r in results if r.get('success', False))
         failed = len(results) - successful
         
-        print(f"\nProcessing completed!")
+        print(f"\nProcessing completed: {job.name}")
         print(f"Total files: {len(results)}")
         print(f"Successful: {successful}")
         print(f"Failed: {failed}")
+        if remaining:
+            print(f"Remaining: {remaining}")
+        avg_first_field = self._avg_time_to_first_field(results)
+        if avg_first_field is not None:
+            print(f"Avg time to first field: {avg_first_field}s")
         print(f"Results saved to: {output_file}")
         
         return output_file
+    
+    def _load_manifest(self, manifest_path: str) -> dict:
+        path = Path(manifest_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Manifest file not found: {manifest_path}")
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.suffix.lower() in ('.yaml', '.yml'):
+                try:
+                    import yaml
+                except ImportError:
+                    raise ImportError("YAML manifests require PyYAML. Install it with `uv add pyyaml` or use a JSON manifest.")
+                manifest = yaml.safe_load(f)
+            else:
+                manifest = json.load(f)
+        
+        if not isinstance(manifest, dict) or not isinstance(manifest.get('jobs'), list) or not manifest['jobs']:
+            raise ValueError(f"Manifest must contain a non-empty 'jobs' list: {manifest_path}")
+        
+        for i, job in enumerate(manifest['jobs'], 1):
+            if not isinstance(job, dict) or 'type' not in job or 'dataset' not in job:
+                raise ValueError(f"Manifest job #{i} must define 'type' and 'dataset'")
+        
+        if manifest.get('budget') is not None and not isinstance(manifest['budget'], dict):
+            raise ValueError(f"Manifest 'budget' must be a mapping, got {manifest['budget']!r}")
+        
+        if manifest.get('workers') is not None:
+            try:
+                manifest['workers'] = int(manifest['workers'])
+            except (TypeError, ValueError):
+                raise ValueError(f"Manifest 'workers' must be an integer, got {manifest['workers']!r}")
+            if manifest['workers'] < 1:
+                raise ValueError(f"Manifest 'workers' must be at least 1, got {manifest['workers']}")
+        
+        return manifest
+    
+    def _run_jobs(self, jobs: List[Job], max_workers: int = 1, priority: str = 'fifo',
+                  type_order: Optional[List[str]] = None, budget: Optional[TokenBudget] = None) -> List[str]:
+        for job in jobs:
+            print(f"{job.name}: {len(job.files)} supported files")
+        
+        runnable = [job for job in jobs if job.files]
+        for job in jobs:
+            if not job.files:
+                print(f"No supported files found for {job.name}")
+                print(f"Supported extensions: {', '.join(self._get_supported_file_extensions())}")
+        
+        if not runnable:
+            return []
+        
+        print(f"Processing files...")
+        scheduler = JobScheduler(max_workers=max_workers, priority=priority, type_order=type_order, budget=budget)
+        remainder = scheduler.run(runnable, self._process_file, estimate_tokens=self._estimate_tokens)
+        
+        output_files = [self._finish_job(job) for job in runnable if any(r is not None for r in job.results)]
+        if remainder:
+            remainder_file = self._save_remainder(scheduler, remainder)
+            print(f"\nBudget exhausted with {len(remainder)} files left. Resume with:")
+            print(f"  python cli.py --manifest {remainder_file}")
+        
+        return output_files
+    
+    def process_dataset(self, document_type_str: str, dataset_dir: str, 
+                       custom_prompt_path: Optional[str] = None, priority: str = 'fifo',
+                       tokens_per_minute: Optional[int] = None, daily_spend: Optional[float] = None,
+                       cost_per_million_tokens: Optional[float] = None) -> str:
+        job = self._build_job(document_type_str, dataset_dir, custom_prompt_path)
+        print(f"Document type: {job.document_type.value}")
+        
+        budget = self._build_budget(tokens_per_minute, daily_spend, cost_per_million_tokens)
+        output_files = self._run_jobs([job], max_workers=1, priority=priority, budget=budget)
+        return output_files[0] if output_files else ""
+    
+    def process_manifest(self, manifest_path: str, max_workers: Optional[int] = None,
+                         priority: Optional[str] = None, type_order: Optional[List[str]] = None,
+                         tokens_per_minute: Optional[int] = None, daily_spend: Optional[float] = None,
+                         cost_per_million_tokens: Optional[float] = None) -> List[str]:
+        """Run every job in a manifest in this process, sharing one processor and worker pool.
 
+        Command-line scheduling options override the manifest's priority and budget settings.
+        """
+        manifest = self._load_manifest(manifest_path)
+        workers = max_workers if max_workers is not None else (manifest.get('workers') or 1)
+        budget_config = manifest.get('budget') or {}
+        budget = self._build_budget(
+            tokens_per_minute if tokens_per_minute is not None else budget_config.get('tokens_per_minute'),
+            daily_spend if daily_spend is not None else budget_config.get('daily_spend'),
+            cost_per_million_tokens if cost_per_million_tokens is not None else budget_config.get('cost_per_million_tokens')
+        )
+        
+        jobs = [
+            self._build_job(entry['type'], entry['dataset'], entry.get('custom_prompt'),
+                            entry.get('files'), entry.get('deadline'))
+            for entry in manifest['jobs']
+        ]
+        print(f"Loaded {len(jobs)} jobs from {manifest_path} ({workers} workers)")
+        
+        return self._run_jobs(
+            jobs,
+            max_workers=workers,
+            priority=priority or manifest.get('priority', 'fifo'),
+            type_order=type_order or manifest.get('type_priority'),
+            budget=budget
+        )
 
 def main():
     parser = argparse.ArgumentParser(
@@ -195,6 +385,18 @@ Examples:
   # Process shop receipts
   python cli.py --type shop_receipt --dataset datasets/shop_receipts
   
+  # Stream responses and abort early on malformed output
+  python cli.py --type resume --dataset datasets/Resume --stream
+  
+  # Run several type/dataset jobs in one process from a YAML or JSON manifest
+  python cli.py --manifest nightly.yaml --workers 4
+  
+  # Write flat Parquet tables (documents, LineItems, ...) instead of one JSON file
+  python cli.py --type shop_receipt --dataset datasets/shop_receipts --export-format parquet
+  
+  # Oldest files first, paced to 1M tokens/minute and capped at $5/day
+  python cli.py --manifest nightly.yaml --priority mtime --tokens-per-minute 1000000 --daily-spend 5 --cost-per-million-tokens 0.3
+  
 Available document types: resume, driving_license, shop_receipt
 Supported file formats: jpg, jpeg, png, pdf, tiff, bmp
         """
@@ -202,21 +404,78 @@ Supported file formats: jpg, jpeg, png, pdf, tiff, bmp
     
     parser.add_argument(
         '--type', '-t',
-        required=True,
         help='Document type to process (resume, driving_license, shop_receipt)'
     )
     
     parser.add_argument(
         '--dataset', '-d',
-        required=True,
         help='Path to dataset directory containing documents to process'
     )
     
+    parser.add_argument(
+        '--manifest', '-m',
+        help='Path to a YAML/JSON run manifest listing several type/dataset/custom_prompt jobs'
+    )
+    
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        help='Number of documents processed concurrently across manifest jobs (overrides the manifest)'
+    )
+    
     parser.add_argument(
         '--custom-prompt', '-p',
         help='Path to custom prompt text file (optional)'
     )
     
+    parser.add_argument(
+        '--priority',
+        choices=['fifo', 'mtime', 'deadline', 'type'],
+        help='Order in which documents are sent (default: fifo, round-robin across jobs)'
+    )
+    
+    parser.add_argument(
+        '--type-priority',
+        help='Comma-separated document types, highest priority first, used with --priority type'
+    )
+    
+    parser.add_argument(
+        '--tokens-per-minute',
+        type=int,
+        help='Pace requests so estimated tokens per minute stay under this limit'
+    )
+    
+    parser.add_argument(
+        '--daily-spend',
+        type=float,
+        help='Stop once estimated spend for today reaches this amount, leaving a resumable remainder'
+    )
+    
+    parser.add_argument(
+        '--cost-per-million-tokens',
+        type=float,
+        help='Price used to turn estimated tokens into spend for --daily-spend'
+    )
+    
+    parser.add_argument(
+        '--stream', '-s',
+        action='store_true',
+        help='Stream LLM responses, parsing incrementally and retrying early on invalid output'
+    )
+    
+    parser.add_argument(
+        '--export-format', '-f',
+        choices=['json', 'jsonl', 'parquet', 'arrow'],
+        default='json',
+        help='Output format: a single JSON file (default) or flat per-field tables as jsonl, parquet or arrow'
+    )
+    
+    parser.add_argument(
+        '--no-preprocess',
+        action='store_true',
+        help='Send images as-is instead of cropping margins and correcting skew first'
+    )
+    
     parser.add_argument(
         '--version', '-v',
         action='version',
@@ -225,12 +484,45 @@ Supported file formats: jpg, jpeg, png, pdf, tiff, bmp
     
     args = parser.parse_args()
     
+    if args.manifest:
+        if args.type or args.dataset or args.custom_prompt:
+            parser.error("--manifest cannot be combined with --type, --dataset or --custom-prompt")
+    elif not (args.type and args.dataset):
+        parser.error("--type and --dataset are required unless --manifest is given")
+    
+    type_order = [t.strip() for t in args.type_priority.split(',')] if args.type_priority else None
+    
     try:
-        cli = DocumentProcessorCLI()
+        cli = DocumentProcessorCLI(
+            stream=args.stream,
+            preprocess=not args.no_preprocess,
+            export_format=args.export_format
+        )
+        
+        if args.manifest:
+            output_files = cli.process_manifest(
+                args.manifest,
+                max_workers=args.workers,
+                priority=args.priority,
+                type_order=type_order,
+                tokens_per_minute=args.tokens_per_minute,
+                daily_spend=args.daily_spend,
+                cost_per_million_tokens=args.cost_per_million_tokens
+            )
+            if output_files:
+                print(f"\n🎉 All results saved to:")
+                for output_file in output_files:
+                    print(f"  {output_file}")
+            return
+        
         output_file = cli.process_dataset(
             document_type_str=args.type,
             dataset_dir=args.dataset,
-            custom_prompt_path=args.custom_prompt
+            custom_prompt_path=args.custom_prompt,
+            priority=args.priority or 'fifo',
+            tokens_per_minute=args.tokens_per_minute,
+            daily_spend=args.daily_spend,
+            cost_per_million_tokens=args.cost_per_million_tokens
         )
         
         if output_file:
@@ -7,6 +7,8 @@ import json
 from prompts.store_recipt import get_store_receipt_prompt
 from prompts.resume import get_resume_prompt
 from core.ocr_handler import OCRHandler
+from core.image_preprocessor import ImagePreprocessor
+from core.stream_parser import StreamAbort
 import time
 
 class DocumentType(Enum):
@@ -36,9 +38,12 @@ class ProcessingResult:
         return f"ProcessingResult({status}, {self.document_type.value})"
 
 class DocumentProcessor:
-    def __init__(self):
-        self.llm_handler = LLMHandler()
-        self.ocr_handler = OCRHandler()
+    def __init__(self, stream: bool = False, preprocess: bool = True):
+        self.stream = stream
+        # One preprocessor shared by both handlers so each file is cropped and deskewed once
+        self.preprocessor = ImagePreprocessor() if preprocess else None
+        self.llm_handler = LLMHandler(preprocessor=self.preprocessor)
+        self.ocr_handler = OCRHandler(preprocessor=self.preprocessor)
 
         self.document_configs = {
             DocumentType.DRIVING_LICENSE: {
@@ -79,6 +84,7 @@ class DocumentProcessor:
         try:
             response = self._clean_response(response)
             data = json.loads(response)
+            
             model = validator_class(**data)
             
             return self._create_result(
@@ -103,12 +109,24 @@ class DocumentProcessor:
                 error_message="Failed to parse JSON response"
             )
 
-    def process_document(self, document_type: DocumentType, image_path: str | None = None, max_retries: int = 3):
-        """Generic document processing method with simple retry logic"""
+    def _generate(self, prompt: str, validator_class, image_path: str | None = None):
+        """Call the LLM, streaming when enabled. Returns the response and time to first field"""
+        if self.stream:
+            return self.llm_handler.generate_response_stream(prompt, validator_class, image_path)
+        return self.llm_handler.generate_response(prompt, image_path), None
+
+    def process_document(self, document_type: DocumentType, image_path: str | None = None, max_retries: int = 3,
+                         prompt_func=None):
+        """Generic document processing method with simple retry logic.
+
+        prompt_func overrides the configured prompt for this call only, so jobs sharing
+        one processor can use different prompts for the same document type.
+        """
         if document_type not in self.document_configs:
             raise ValueError(f"Unsupported document type: {document_type}")
         
         config = self.document_configs[document_type]
+        prompt_func = prompt_func or config['prompt_func']
         last_error = None
         
         for attempt in range(max_retries):
@@ -116,15 +134,18 @@ class DocumentProcessor:
                 if config['uses_ocr'] and image_path: # TODO: We can use this to reduce cost of LLM calls
                     ocr_text = self.ocr_handler.process_image(image_path)
                     ocr_text_str = " ".join([result[1] for result in ocr_text]).strip()
-                    prompt = config['prompt_func'](ocr_text_str)
-                    response = self.llm_handler.generate_response(prompt)
+                    prompt = prompt_func(ocr_text_str)
+                    response, first_field_time = self._generate(prompt, config['validator_class'])
                 else:
-                    prompt = config['prompt_func']()
-                    response = self.llm_handler.generate_response(prompt, image_path)
+                    prompt = prompt_func()
+                    response, first_field_time = self._generate(prompt, config['validator_class'], image_path)
                 
                 result = self._process_llm_response(response, config['validator_class'], document_type)
                 
                 if result['success']:
+                    if self.stream:
+                        result['time_to_first_field'] = first_field_time
+                    result['attempts'] = attempt + 1
                     return result
                 
                 last_error = result['error_message'] # TODO: We can use this error to retry the request
@@ -132,14 +153,19 @@ class DocumentProcessor:
                 if attempt < max_retries - 1:
                     time.sleep(1.0 * (attempt + 1))
                     
+            except StreamAbort as e:
+                # The stream was cut short on bad output, so retry right away without backoff
+                last_error = f"Stream aborted: {e}"
             except Exception as e:
                 last_error = str(e)
                 if attempt < max_retries - 1:
                     time.sleep(1.0 * (attempt + 1))
 
-        return self._create_result(
+        result = self._create_result(
             success=False,
             document_type=document_type,
             raw_response="",
             error_message=f"Failed after {max_retries} attempts. Last error: {last_error}"
         )
+        result['attempts'] = max_retries
+        return result
@@ -0,0 +1,148 @@
+from pathlib import Path
+from typing import List, Optional, get_args, get_origin
+from pydantic import BaseModel, TypeAdapter, ValidationError
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+EXPORT_FORMATS = ('jsonl', 'parquet', 'arrow')
+
+
+def _list_item_type(annotation):
+    """Return the item type if annotation is List[X] or Optional[List[X]], else None"""
+    if get_origin(annotation) in (list, List):
+        return get_args(annotation)[0]
+    for arg in get_args(annotation):
+        if get_origin(arg) in (list, List):
+            return get_args(arg)[0]
+    return None
+
+
+class ResultExporter:
+    """Rebuilds typed models from processing results in one batch and writes them as related flat tables.
+
+    Scalar fields go into a `documents` table. Every list field (LineItems, work_experience,
+    education, skills, ...) becomes its own table keyed by `document_id` and `position`.
+    """
+    def __init__(self, validator_class, export_format: str = 'parquet', compression: str = 'zstd'):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Invalid export format '{export_format}'. Available formats: {list(EXPORT_FORMATS)}")
+        self.validator_class = validator_class
+        self.export_format = export_format
+        self.compression = compression
+        self.adapter = TypeAdapter(List[validator_class])
+
+    def validate_batch(self, results: List[dict]) -> List[Optional[BaseModel]]:
+        """Turn every successful result's `validated_data` into a model in one TypeAdapter call.
+
+        DocumentProcessor has already validated (and retried) each document, so this pass builds
+        the typed models used for flattening. Results whose data no longer fits the schema, e.g.
+        loaded from an older output file, come back as None and are marked unsuccessful in place.
+        """
+        indices = [i for i, r in enumerate(results) if r.get('success', False) and r.get('validated_data') is not None]
+        models = [None] * len(results)
+
+        while indices:
+            try:
+                validated = self.adapter.validate_python([results[i]['validated_data'] for i in indices])
+            except ValidationError as e:
+                bad = {}
+                for error in e.errors():
+                    field = ".".join(str(part) for part in error['loc'][1:])
+                    bad.setdefault(indices[error['loc'][0]], []).append(f"{field}: {error['msg']}")
+                for i, messages in bad.items():
+                    results[i]['success'] = False
+                    results[i]['error_message'] = "; ".join(messages)
+                indices = [i for i in indices if i not in bad]
+                continue
+
+            for i, model in zip(indices, validated):
+                models[i] = model
+            break
+
+        return models
+
+    def flatten(self, results: List[dict], models: List[Optional[BaseModel]]) -> dict:
+        """Split results into a documents table plus one child table per list field"""
+        scalar_fields = []
+        list_fields = {}
+        for name, field in self.validator_class.model_fields.items():
+            item_type = _list_item_type(field.annotation)
+            if item_type is None:
+                scalar_fields.append(name)
+            else:
+                list_fields[name] = item_type
+
+        tables = {'documents': []}
+        tables.update({name: [] for name in list_fields})
+
+        for document_id, (result, model) in enumerate(zip(results, models)):
+            row = {
+                'document_id': document_id,
+                'document_type': result.get('document_type'),
+                'file_name': result.get('file_name'),
+                'file_path': result.get('file_path'),
+                'success': result.get('success', False),
+                'error_message': result.get('error_message'),
+                'time_to_first_field': result.get('time_to_first_field'),
+            }
+            for name in scalar_fields:
+                row[name] = getattr(model, name) if model else None
+            tables['documents'].append(row)
+
+            if model is None:
+                continue
+            for name, item_type in list_fields.items():
+                for position, item in enumerate(getattr(model, name) or []):
+                    child = {'document_id': document_id, 'position': position}
+                    if isinstance(item_type, type) and issubclass(item_type, BaseModel):
+                        child.update(item.model_dump())
+                    else:
+                        child['value'] = item
+                    tables[name].append(child)
+
+        return tables
+
+    def _write_table(self, rows: List[dict], path: Path):
+        if self.export_format == 'jsonl':
+            with open(path, 'wb') as f:
+                for row in rows:
+                    if orjson:
+                        f.write(orjson.dumps(row) + b"\n")
+                    else:
+                        f.write(json.dumps(row, ensure_ascii=False).encode('utf-8') + b"\n")
+            return
+
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("Parquet/Arrow export requires pyarrow. Install it with `uv add pyarrow` or use jsonl.")
+
+        table = pa.Table.from_pylist(rows)
+        if self.export_format == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(table, path, compression=self.compression)
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(table, path, compression=self.compression)
+
+    def export(self, results: List[dict], output_dir: Path) -> List[str]:
+        """Validate, flatten and write results into output_dir, returning the written files"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        models = self.validate_batch(results)
+        tables = self.flatten(results, models)
+
+        suffix = {'jsonl': '.jsonl', 'parquet': '.parquet', 'arrow': '.arrow'}[self.export_format]
+        written = []
+        for name, rows in tables.items():
+            if not rows and name != 'documents':
+                continue
+            path = output_dir / f"{name}{suffix}"
+            self._write_table(rows, path)
+            written.append(str(path))
+        return written
@@ -0,0 +1,132 @@
+from collections import OrderedDict
+from PIL import Image
+import numpy as np
+import os
+import threading
+
+
+class ImagePreprocessor:
+    """Crops margins/scanner borders and corrects skew before images are encoded or OCR'd.
+
+    Normalized images are cached by path, size and mtime, so retries and the LLM/OCR pair for
+    one file reuse the work. Cached images are shared and must not be modified.
+    """
+    ANALYSIS_SIZE = 512
+    MAX_SKEW_POINTS = 50_000
+    INK_THRESHOLD = 40
+    MIN_INK_FRACTION = 0.005
+    MAX_INK_FRACTION = 0.98
+    PADDING_FRACTION = 0.02
+    MAX_SKEW_ANGLE = 5.0
+    SKEW_STEP = 0.25
+    MIN_SKEW_CORRECTION = 1.0
+    MIN_SKEW_GAIN = 1.2
+
+    def __init__(self, cache_size: int = 8):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cache_key(self, image_path) -> tuple:
+        stat = os.stat(image_path)
+        return os.path.abspath(image_path), stat.st_size, stat.st_mtime_ns
+
+    def _analysis_array(self, img: Image.Image):
+        """Downscaled grayscale copy used for detection, with its scale factor"""
+        scale = min(1.0, self.ANALYSIS_SIZE / max(img.size))
+        small = img if scale == 1.0 else img.resize(
+            (max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.BILINEAR
+        )
+        return np.asarray(small, dtype=np.int16), scale
+
+    def _ink_mask(self, arr: np.ndarray):
+        background = np.median(arr)
+        return np.abs(arr - background) > self.INK_THRESHOLD, background
+
+    def _content_span(self, fractions: np.ndarray):
+        """First and last index whose ink fraction looks like content rather than blank or border"""
+        content = np.flatnonzero((fractions > self.MIN_INK_FRACTION) & (fractions < self.MAX_INK_FRACTION))
+        if content.size == 0:
+            return 0, len(fractions)
+        return content[0], content[-1] + 1
+
+    def _estimate_skew(self, mask: np.ndarray) -> float:
+        """Angle in degrees whose row projection of the ink is sharpest"""
+        ys, xs = np.nonzero(mask)
+        if ys.size < 100:
+            return 0.0
+        if ys.size > self.MAX_SKEW_POINTS:
+            step = ys.size // self.MAX_SKEW_POINTS + 1
+            ys, xs = ys[::step], xs[::step]
+
+        angles = np.arange(-self.MAX_SKEW_ANGLE, self.MAX_SKEW_ANGLE + self.SKEW_STEP / 2, self.SKEW_STEP)
+        scores = []
+        for angle in angles:
+            # Text lines skewed by `angle` line up into sharp rows once sheared back
+            rows = np.round(ys - xs * np.tan(np.radians(angle))).astype(np.int64)
+            scores.append(float(np.var(np.bincount(rows - rows.min()))))
+
+        best = int(np.argmax(scores))
+        straight = scores[int(np.argmin(np.abs(angles)))]
+        # A peak at the edge of the search range or barely above the unrotated score is
+        # usually photo background rather than text lines, so leave the image alone
+        if best in (0, len(angles) - 1) or scores[best] < straight * self.MIN_SKEW_GAIN:
+            return 0.0
+        return float(angles[best])
+
+    def _crop_to_content(self, img: Image.Image, arr: np.ndarray, mask: np.ndarray) -> Image.Image:
+        scale = arr.shape[1] / img.width
+        top, bottom = self._content_span(mask.mean(axis=1))
+        left, right = self._content_span(mask.mean(axis=0))
+
+        pad_y = round(arr.shape[0] * self.PADDING_FRACTION)
+        pad_x = round(arr.shape[1] * self.PADDING_FRACTION)
+        box = (
+            max(0, int((left - pad_x) / scale)),
+            max(0, int((top - pad_y) / scale)),
+            min(img.width, int(np.ceil((right + pad_x) / scale))),
+            min(img.height, int(np.ceil((bottom + pad_y) / scale))),
+        )
+        if box == (0, 0, img.width, img.height):
+            return img
+        return img.crop(box)
+
+    def _normalize(self, image_path) -> Image.Image:
+        img = Image.open(image_path)
+        img.load()
+        img = img.convert("L")
+
+        arr, _ = self._analysis_array(img)
+        mask, background = self._ink_mask(arr)
+        cropped = self._crop_to_content(img, arr, mask)
+
+        angle = self._estimate_skew(mask)
+        if abs(angle) < self.MIN_SKEW_CORRECTION:
+            return cropped
+
+        # PIL rotates counter-clockwise; the estimate is the clockwise skew in image coordinates
+        rotated = img.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=int(background))
+        arr, _ = self._analysis_array(rotated)
+        mask, _ = self._ink_mask(arr)
+        deskewed = self._crop_to_content(rotated, arr, mask)
+
+        # Expanding the canvas can outweigh the trimmed margins; never upload more than the straight crop
+        if deskewed.width * deskewed.height > cropped.width * cropped.height:
+            return cropped
+        return deskewed
+
+    def normalize(self, image_path) -> Image.Image:
+        """Return the cropped, deskewed grayscale image for image_path"""
+        key = self._cache_key(image_path)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        img = self._normalize(image_path)
+
+        with self._lock:
+            self._cache[key] = img
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return img
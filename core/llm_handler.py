@@ -1,20 +1,22 @@
 import litellm
 from PIL import Image, ImageEnhance
 from config import Config
+from core.stream_parser import IncrementalJSONParser, StreamAbort
 import os
 import base64
 import io
 
 
 class LLMHandler:
-    def __init__(self):
+    def __init__(self, preprocessor=None):
         litellm.set_verbose = False
+        self.preprocessor = preprocessor
         
         os.environ["GEMINI_API_KEY"] = Config.GEMINI_API_KEY
         self.model_name = Config.LLM_MODEL
 
     def _encode_image_to_base64(self, image_path):
-        img = Image.open(image_path)
+        img = self.preprocessor.normalize(image_path) if self.preprocessor else Image.open(image_path)
         img = img.convert("L")
         img = ImageEnhance.Contrast(img).enhance(3.0)
         
@@ -23,23 +25,24 @@ class LLMHandler:
         img_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
         return f"data:image/png;base64,{img_base64}"
 
+    def _build_messages(self, prompt, image_path=None):
+        if image_path and os.path.exists(image_path):
+            image_base64 = self._encode_image_to_base64(image_path)
+            return [{
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prompt},
+                    {"type": "image_url", "image_url": {"url": image_base64}}
+                ]
+            }]
+        return [{
+            "role": "user",
+            "content": prompt
+        }]
+
     def generate_response(self, prompt, image_path=None):
         try:
-            messages = []
-            if image_path and os.path.exists(image_path):
-                image_base64 = self._encode_image_to_base64(image_path)
-                messages.append({
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {"type": "image_url", "image_url": {"url": image_base64}}
-                    ]
-                })
-            else:
-                messages.append({
-                    "role": "user",
-                    "content": prompt
-                })
+            messages = self._build_messages(prompt, image_path)
             
             response = litellm.completion(
                 model=self.model_name,
@@ -50,3 +53,34 @@ class LLMHandler:
             
         except Exception as e:
             raise Exception(f"Error generating response: {str(e)}")
+
+    def generate_response_stream(self, prompt, validator_class, image_path=None):
+        """Stream the completion, aborting as soon as it cannot validate against validator_class.
+
+        Returns the full response text and the seconds until the first top-level field completed.
+        """
+        try:
+            messages = self._build_messages(prompt, image_path)
+            parser = IncrementalJSONParser(validator_class)
+
+            stream = litellm.completion(
+                model=self.model_name,
+                messages=messages,
+                stream=True,
+            )
+
+            try:
+                for chunk in stream:
+                    parser.feed(chunk.choices[0].delta.content or "")
+            finally:
+                close = getattr(stream, "close", None)
+                if callable(close):
+                    close()
+
+            parser.close()
+            return parser.text, parser.first_field_time
+
+        except StreamAbort:
+            raise
+        except Exception as e:
+            raise Exception(f"Error generating response: {str(e)}")
@@ -3,11 +3,12 @@ from PIL import Image, ImageEnhance
 import numpy as np
 
 class OCRHandler:
-    def __init__(self):
+    def __init__(self, preprocessor=None):
         self.reader = easyocr.Reader(['en']) # TODO: Add support for multiple languages
+        self.preprocessor = preprocessor
 
     def process_image(self, image_path):
-        image = Image.open(image_path)
+        image = self.preprocessor.normalize(image_path) if self.preprocessor else Image.open(image_path)
         image = ImageEnhance.Contrast(image).enhance(2.0)
         results = self.reader.readtext(np.array(image))
         return results
\ No newline at end of file
@@ -0,0 +1,247 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime
+from itertools import zip_longest
+from pathlib import Path
+from typing import Callable, List, Optional
+from PIL import Image
+import json
+import math
+import time
+
+# Gemini bills small images as one 258-token tile and larger ones per 768x768 tile
+IMAGE_TILE_TOKENS = 258
+IMAGE_TILE_SIZE = 768
+SMALL_IMAGE_SIZE = 384
+# Rough fallback when the image header cannot be read (e.g. PDFs)
+BYTES_PER_TILE = 200_000
+CHARS_PER_TOKEN = 4
+DEFAULT_OUTPUT_TOKENS = 512
+
+PRIORITIES = ('fifo', 'mtime', 'deadline', 'type')
+
+
+def estimate_document_tokens(file_path: Path, prompt: str, output_tokens: int = DEFAULT_OUTPUT_TOKENS) -> int:
+    """Estimate prompt, image and completion tokens for one document"""
+    try:
+        with Image.open(file_path) as img:
+            width, height = img.size
+        if width <= SMALL_IMAGE_SIZE and height <= SMALL_IMAGE_SIZE:
+            tiles = 1
+        else:
+            tiles = math.ceil(width / IMAGE_TILE_SIZE) * math.ceil(height / IMAGE_TILE_SIZE)
+    except Exception:
+        tiles = max(1, math.ceil(Path(file_path).stat().st_size / BYTES_PER_TILE))
+
+    prompt_tokens = math.ceil(len(prompt) / CHARS_PER_TOKEN)
+    return prompt_tokens + tiles * IMAGE_TILE_TOKENS + output_tokens
+
+
+class TokenBudget:
+    """Tokens-per-minute pacing plus a daily spend cap tracked in a ledger file"""
+    def __init__(self, tokens_per_minute: Optional[int] = None, daily_spend: Optional[float] = None,
+                 cost_per_million_tokens: float = 0.0, ledger_path: Optional[Path] = None):
+        if daily_spend is not None and cost_per_million_tokens <= 0:
+            raise ValueError("cost_per_million_tokens must be positive when daily_spend is set")
+        self.tokens_per_minute = tokens_per_minute
+        self.daily_spend = daily_spend
+        self.cost_per_million_tokens = cost_per_million_tokens
+        self.ledger_path = Path(ledger_path) if ledger_path else None
+        self._window = deque()
+        self._ledger = self._load_ledger()
+
+    def _load_ledger(self) -> dict:
+        if self.ledger_path and self.ledger_path.exists():
+            with open(self.ledger_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def save(self):
+        if self.ledger_path:
+            with open(self.ledger_path, 'w', encoding='utf-8') as f:
+                json.dump(self._ledger, f, indent=2)
+
+    def to_config(self) -> dict:
+        """Settings in the manifest's `budget` format, so a resumed run keeps the same limits"""
+        return {
+            'tokens_per_minute': self.tokens_per_minute,
+            'daily_spend': self.daily_spend,
+            'cost_per_million_tokens': self.cost_per_million_tokens,
+        }
+
+    @property
+    def spent_today(self) -> float:
+        return self._ledger.get(date.today().isoformat(), 0.0)
+
+    def cost(self, tokens: int) -> float:
+        return tokens * self.cost_per_million_tokens / 1_000_000
+
+    def can_afford(self, tokens: int) -> bool:
+        if self.daily_spend is None:
+            return True
+        return self.spent_today + self.cost(tokens) <= self.daily_spend
+
+    def _window_tokens(self, now: float) -> int:
+        while self._window and now - self._window[0][0] >= 60:
+            self._window.popleft()
+        return sum(tokens for _, tokens in self._window)
+
+    def wait_for_capacity(self, tokens: int):
+        """Block until the last minute's tokens leave room for this request"""
+        if self.tokens_per_minute is None:
+            return
+        while True:
+            now = time.monotonic()
+            used = self._window_tokens(now)
+            # A request larger than the whole limit goes through once the window is empty
+            if not self._window or used + tokens <= self.tokens_per_minute:
+                return
+            time.sleep(max(0.05, 60 - (now - self._window[0][0])))
+
+    def charge(self, tokens: int):
+        self._window.append((time.monotonic(), tokens))
+        today = date.today().isoformat()
+        self._ledger[today] = round(self._ledger.get(today, 0.0) + self.cost(tokens), 6)
+
+
+class Job:
+    """A batch of files of one document type, processed with an optional prompt override"""
+    def __init__(self, name: str, document_type, files: List[Path], dataset_name: str,
+                 prompt_func: Optional[Callable] = None, custom_prompt_name: Optional[str] = None,
+                 deadline: Optional[datetime] = None, source: Optional[dict] = None):
+        self.name = name
+        self.dataset_name = dataset_name
+        self.deadline = deadline
+        # Manifest entry the job came from, used to write a resumable remainder
+        self.source = source or {}
+        self.document_type = document_type
+        self.files = files
+        self.prompt_func = prompt_func
+        self.custom_prompt_name = custom_prompt_name
+        self.results: List[Optional[dict]] = [None] * len(files)
+
+    def __repr__(self):
+        return f"Job({self.name}, {self.document_type.value}, {len(self.files)} files)"
+
+
+class JobScheduler:
+    """Runs several jobs on one shared worker pool.
+
+    Files are interleaved round-robin across jobs, then ordered by the configured priority.
+    With a budget, requests are paced to the tokens-per-minute limit. When the next file no
+    longer fits the daily spend cap, smaller files further down the queue are sent instead,
+    and the run stops once nothing left fits, returning the unprocessed remainder.
+    """
+    def __init__(self, max_workers: int = 1, priority: str = 'fifo', type_order: Optional[List[str]] = None,
+                 budget: Optional[TokenBudget] = None):
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Invalid priority '{priority}'. Available priorities: {list(PRIORITIES)}")
+        self.max_workers = max_workers
+        self.priority = priority
+        self.type_order = type_order or []
+        self.budget = budget
+
+    def _interleave(self, jobs: List[Job]):
+        """Yield (job, index) pairs taking one file from each job in turn"""
+        per_job = [[(job, i) for i in range(len(job.files))] for job in jobs]
+        for batch in zip_longest(*per_job):
+            for item in batch:
+                if item is not None:
+                    yield item
+
+    def _order(self, jobs: List[Job]) -> List[tuple]:
+        tasks = list(self._interleave(jobs))
+        if self.priority == 'mtime':
+            return sorted(tasks, key=lambda t: t[0].files[t[1]].stat().st_mtime)
+        if self.priority == 'deadline':
+            return sorted(tasks, key=lambda t: (t[0].deadline is None, t[0].deadline or datetime.max))
+        if self.priority == 'type':
+            ranks = {name: i for i, name in enumerate(self.type_order)}
+            return sorted(tasks, key=lambda t: ranks.get(t[0].document_type.value, len(ranks)))
+        return tasks
+
+    def remainder_manifest(self, remainder: List[tuple]) -> dict:
+        """Manifest for the unprocessed (job, index) pairs, carrying this run's scheduling settings"""
+        jobs = {}
+        for job, index in remainder:
+            entry = jobs.setdefault(id(job), {k: v for k, v in job.source.items() if v is not None})
+            entry.setdefault('files', []).append(str(job.files[index]))
+
+        manifest = {
+            'workers': self.max_workers,
+            'priority': self.priority,
+        }
+        if self.type_order:
+            manifest['type_priority'] = self.type_order
+        if self.budget:
+            manifest['budget'] = self.budget.to_config()
+        manifest['jobs'] = list(jobs.values())
+        return manifest
+
+    def _report(self, job: Job, index: int, done: int, result: dict):
+        status = "✓ SUCCESS" if result.get('success', False) else "✗ FAILED"
+        print(f"[{job.name}] [{done}/{len(job.files)}] {job.files[index].name}: {status}")
+        if not result.get('success', False) and result.get('error_message'):
+            print(f"    Error: {result['error_message']}")
+
+    def run(self, jobs: List[Job], process_file: Callable[[Job, Path], dict],
+            estimate_tokens: Optional[Callable[[Job, Path], int]] = None) -> List[tuple]:
+        """Process files of every job, filling in job.results in file order.
+
+        Returns the (job, index) pairs left unprocessed because the budget ran out.
+        """
+        done = {id(job): 0 for job in jobs}
+        pending = deque(self._order(jobs))
+        in_flight = {}
+        estimates = {}
+        out_of_budget = False
+
+        def tokens_for(job, index):
+            key = (id(job), index)
+            if key not in estimates:
+                estimates[key] = estimate_tokens(job, job.files[index]) if estimate_tokens else 0
+            return estimates[key]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                while pending or in_flight:
+                    while pending and not out_of_budget and len(in_flight) < self.max_workers:
+                        position = 0
+                        if self.budget:
+                            # Highest-priority file that still fits under today's spend cap
+                            position = next(
+                                (i for i, (job, index) in enumerate(pending)
+                                 if self.budget.can_afford(tokens_for(job, index))),
+                                None
+                            )
+                            if position is None:
+                                out_of_budget = True
+                                print(f"Daily spend budget reached; {len(pending)} files left for a later run")
+                                break
+                        job, index = pending[position]
+                        del pending[position]
+                        if self.budget:
+                            self.budget.wait_for_capacity(tokens_for(job, index))
+                            self.budget.charge(tokens_for(job, index))
+                        in_flight[executor.submit(process_file, job, job.files[index])] = (job, index)
+
+                    if not in_flight:
+                        break
+
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        job, index = in_flight.pop(future)
+                        result = future.result()
+                        job.results[index] = result
+                        if self.budget and result.get('attempts', 1) > 1:
+                            # Every retry is another LLM call; bill it to the ledger after the fact
+                            self.budget.charge(tokens_for(job, index) * (result['attempts'] - 1))
+                        done[id(job)] += 1
+                        self._report(job, index, done[id(job)], result)
+            finally:
+                if self.budget:
+                    self.budget.save()
+
+        return list(pending)
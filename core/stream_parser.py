@@ -0,0 +1,202 @@
+from typing import Union, get_args, get_origin
+import time
+import types
+
+# First characters a JSON value may start with for each kind of field annotation
+VALUE_STARTS = {
+    'str': '"',
+    'list': '[',
+    'model': '{',
+    'number': '-0123456789"',
+}
+
+
+def _value_kind(annotation):
+    """Classify a field annotation as str/list/model/number, or None when anything may fit.
+
+    Returns the kind and whether null is accepted.
+    """
+    optional = False
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        optional = len(args) < len(get_args(annotation))
+        if len(args) != 1:
+            return None, optional
+        annotation = args[0]
+
+    if get_origin(annotation) is list or annotation is list:
+        return 'list', optional
+    if isinstance(annotation, type) and hasattr(annotation, 'model_fields'):
+        return 'model', optional
+    if annotation is str:
+        return 'str', optional
+    if annotation in (int, float):
+        return 'number', optional
+    return None, optional
+
+
+class StreamAbort(Exception):
+    """Raised when a streamed response can no longer become valid JSON for the validator"""
+
+
+class IncrementalJSONParser:
+    """Scans a streamed JSON object chunk by chunk and fails fast on bad output"""
+
+    MAX_FENCE_LENGTH = 16
+
+    def __init__(self, validator_class):
+        self.validator_class = validator_class
+        self.allowed_fields = set(validator_class.model_fields)
+        # Pydantic ignores unknown keys unless the model forbids them, so only then are they fatal
+        self.forbid_extra = validator_class.model_config.get('extra') == 'forbid'
+        self.required_fields = {
+            name for name, field in validator_class.model_fields.items() if field.is_required()
+        }
+        self.field_kinds = {
+            name: _value_kind(field.annotation) for name, field in validator_class.model_fields.items()
+        }
+        self.text = ""
+
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._reading_key = False
+        self._current_key = ""
+        self._expect_value = False
+        self._keys_seen = set()
+        self._fields_seen = 0
+
+        self.start_time = time.perf_counter()
+        self.first_field_time = None
+
+    def _abort(self, reason: str):
+        raise StreamAbort(f"{reason} (after {len(self.text)} chars)")
+
+    def _find_object_start(self) -> int | None:
+        """Return the index of the opening brace once the preamble is known to be harmless"""
+        stripped = self.text.lstrip()
+        offset = len(self.text) - len(stripped)
+
+        # The opening fence itself may arrive split across chunks
+        if "```".startswith(stripped):
+            return None
+
+        if stripped.startswith("```"):
+            newline = stripped.find("\n")
+            if newline == -1:
+                if len(stripped) > self.MAX_FENCE_LENGTH:
+                    self._abort("Response starts with a code fence that never ends")
+                return None
+            body = stripped[newline + 1:]
+            offset += newline + 1 + len(body) - len(body.lstrip())
+            stripped = body.lstrip()
+
+        if not stripped:
+            return None
+        if stripped[0] != "{":
+            self._abort(f"Response does not start with a JSON object: {stripped[:20]!r}")
+        return offset
+
+    def _check_value_start(self, ch: str):
+        """Abort when a top-level value cannot match its field's type, judged by its first character"""
+        kind, optional = self.field_kinds.get(self._current_key, (None, True))
+        if kind is None:
+            return
+        if ch == 'n' and optional:
+            return
+        if ch not in VALUE_STARTS[kind]:
+            self._abort(f"Field '{self._current_key}' of {self.validator_class.__name__} expects a {kind} value, got {ch!r}")
+
+    def _complete_field(self):
+        self._fields_seen += 1
+        if self.first_field_time is None:
+            self.first_field_time = time.perf_counter() - self.start_time
+
+    def _scan(self, chunk: str):
+        for ch in chunk:
+            if self._finished:
+                if not ch.isspace() and ch != "`":
+                    self._abort("Unexpected text after the JSON object")
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._reading_key:
+                        self._reading_key = False
+                        self._keys_seen.add(self._current_key)
+                        if self.forbid_extra and self._current_key not in self.allowed_fields:
+                            self._abort(f"Unexpected field '{self._current_key}' for {self.validator_class.__name__}")
+                elif self._reading_key:
+                    self._current_key += ch
+                continue
+
+            if ch.isspace():
+                continue
+
+            if self._expect_value:
+                self._expect_value = False
+                self._check_value_start(ch)
+
+            if ch == ':' and self._depth == 1:
+                self._expect_value = True
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._expect_key = False
+                    self._reading_key = True
+                    self._current_key = ""
+            elif self._depth == 1 and self._expect_key and ch != "}":
+                self._abort(f"Expected a field name, got {ch!r}")
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = True
+            elif ch in "}]":
+                if self._depth == 1 and self._current_key:
+                    self._complete_field()
+                    self._current_key = ""
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finished = True
+            elif ch == "," and self._depth == 1:
+                self._complete_field()
+                self._current_key = ""
+                self._expect_key = True
+
+    def feed(self, chunk: str):
+        """Consume the next chunk of streamed text, raising StreamAbort on invalid output"""
+        if not chunk:
+            return
+
+        self.text += chunk
+
+        if self._started:
+            self._scan(chunk)
+            return
+
+        start = self._find_object_start()
+        if start is None:
+            return
+
+        self._started = True
+        self._scan(self.text[start:])
+
+    def close(self):
+        """Check the stream ended with a complete JSON object"""
+        if not self._finished:
+            self._abort("Stream ended before the JSON object was complete")
+        missing = self.required_fields - self._keys_seen
+        if missing:
+            self._abort(f"Missing required fields for {self.validator_class.__name__}: {sorted(missing)}")
+
+    @property
+    def fields_seen(self) -> int:
+        return self._fields_seen
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from core.exporter import ResultExporter
+from core.validator import Resume, ShopReceipt
+
+
+def resume_result(name, validated_data, success=True):
+    return {
+        'success': success,
+        'document_type': 'resume',
+        'file_name': name,
+        'file_path': f"datasets/Resume/{name}",
+        'validated_data': validated_data,
+        'error_message': None if success else "Invalid JSON",
+    }
+
+
+def mixed_resume_results():
+    return [
+        resume_result("good.png", {
+            'full_name': "Ada Lovelace",
+            'skills': ["Python", "SQL"],
+            'work_experience': [{'company': "Acme", 'role': "Engineer", 'dates': None}],
+            'education': [],
+        }),
+        # Stored data that no longer fits the schema, e.g. loaded from an older output file
+        resume_result("stale.png", {'full_name': "Bad", 'skills': "Python"}),
+        resume_result("failed.png", None, success=False),
+        resume_result("minimal.png", {'full_name': "Grace Hopper"}),
+    ]
+
+
+def test_validate_batch_builds_models_and_marks_bad_payloads_failed():
+    results = mixed_resume_results()
+
+    models = ResultExporter(Resume, 'jsonl').validate_batch(results)
+
+    assert [type(m).__name__ if m else None for m in models] == ['Resume', None, None, 'Resume']
+    assert results[1]['success'] is False
+    assert results[1]['error_message'].startswith("skills:")
+    assert results[2]['error_message'] == "Invalid JSON"
+    assert results[0]['success'] and results[3]['success']
+
+
+def test_flatten_splits_list_fields_into_child_tables():
+    exporter = ResultExporter(Resume, 'jsonl')
+    results = mixed_resume_results()
+
+    tables = exporter.flatten(results, exporter.validate_batch(results))
+
+    assert [row['full_name'] for row in tables['documents']] == ["Ada Lovelace", None, None, "Grace Hopper"]
+    assert [row['success'] for row in tables['documents']] == [True, False, False, True]
+    assert tables['skills'] == [
+        {'document_id': 0, 'position': 0, 'value': "Python"},
+        {'document_id': 0, 'position': 1, 'value': "SQL"},
+    ]
+    assert tables['work_experience'] == [
+        {'document_id': 0, 'position': 0, 'company': "Acme", 'role': "Engineer", 'dates': None},
+    ]
+    assert tables['education'] == []
+
+
+def test_export_jsonl_skips_empty_child_tables(tmp_path):
+    results = [{
+        'success': True,
+        'document_type': 'shop_receipt',
+        'file_name': "receipt.png",
+        'validated_data': {'MerchantName': "Corner Shop", 'TotalAmount': 3.5,
+                           'LineItems': [{'ItemName': "Milk", 'Price': 1.5}, {'ItemName': "Bread", 'Price': 2.0}]},
+    }]
+
+    written = ResultExporter(ShopReceipt, 'jsonl').export(results, tmp_path)
+
+    assert sorted(p.rsplit("/", 1)[-1] for p in written) == ["LineItems.jsonl", "documents.jsonl"]
+    items = [json.loads(line) for line in (tmp_path / "LineItems.jsonl").read_text().splitlines()]
+    assert [(i['position'], i['ItemName'], i['Quantity']) for i in items] == [(0, "Milk", 1.0), (1, "Bread", 1.0)]
+
+
+def test_export_parquet_round_trips(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    results = mixed_resume_results()
+
+    ResultExporter(Resume, 'parquet').export(results, tmp_path)
+
+    documents = pq.read_table(tmp_path / "documents.parquet").to_pylist()
+    assert [row['file_name'] for row in documents] == ["good.png", "stale.png", "failed.png", "minimal.png"]
+    assert pq.read_table(tmp_path / "skills.parquet").column('value').to_pylist() == ["Python", "SQL"]
+
+
+def test_unknown_export_format_is_rejected():
+    with pytest.raises(ValueError, match="Invalid export format"):
+        ResultExporter(Resume, 'csv')
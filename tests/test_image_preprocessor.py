@@ -0,0 +1,60 @@
+import os
+
+import pytest
+from PIL import Image, ImageDraw
+
+from core.image_preprocessor import ImagePreprocessor
+
+
+def synthetic_page(width=800, height=1000, margin=150) -> Image.Image:
+    """White page with a large blank margin around dark, text-like lines"""
+    page = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(page)
+    for y in range(margin, height - margin, 30):
+        draw.rectangle((margin, y, width - margin, y + 8), fill=0)
+    return page
+
+
+def skew_of(preprocessor: ImagePreprocessor, img: Image.Image) -> float:
+    arr, _ = preprocessor._analysis_array(img)
+    mask, _ = preprocessor._ink_mask(arr)
+    return preprocessor._estimate_skew(mask)
+
+
+@pytest.mark.parametrize("angle", [3.0, -3.0])
+def test_skew_estimate_has_the_sign_that_undoes_the_rotation(angle):
+    preprocessor = ImagePreprocessor()
+    rotated = synthetic_page().rotate(angle, expand=True, fillcolor=255)
+
+    estimate = skew_of(preprocessor, rotated)
+
+    assert estimate == pytest.approx(-angle, abs=0.5)
+    # PIL rotates counter-clockwise, so rotating by the estimate straightens the page
+    straightened = rotated.rotate(estimate, expand=True, fillcolor=255)
+    assert abs(skew_of(preprocessor, straightened)) < 1.0
+
+
+def test_normalize_trims_blank_margins_and_deskews(tmp_path):
+    path = tmp_path / "page.png"
+    synthetic_page().rotate(-3.0, expand=True, fillcolor=255).save(path)
+    original = Image.open(path)
+
+    normalized = ImagePreprocessor().normalize(path)
+
+    assert normalized.mode == "L"
+    assert normalized.width * normalized.height < 0.7 * original.width * original.height
+    assert abs(skew_of(ImagePreprocessor(), normalized)) < 1.0
+
+
+def test_cache_is_reused_until_the_file_changes(tmp_path):
+    path = tmp_path / "page.png"
+    synthetic_page().save(path)
+    preprocessor = ImagePreprocessor(cache_size=1)
+
+    first = preprocessor.normalize(path)
+    assert preprocessor.normalize(path) is first
+
+    synthetic_page(margin=50).save(path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert preprocessor.normalize(path) is not first
@@ -0,0 +1,103 @@
+import json
+from enum import Enum
+from pathlib import Path
+
+from core.scheduler import Job, JobScheduler, TokenBudget, estimate_document_tokens
+
+
+class FakeType(Enum):
+    RESUME = "resume"
+    SHOP_RECEIPT = "shop_receipt"
+
+
+def make_job(tmp_path: Path, names, document_type=FakeType.RESUME, **source):
+    files = []
+    for name in names:
+        path = tmp_path / name
+        path.write_bytes(b"")
+        files.append(path)
+    return Job(document_type.value, document_type, files, tmp_path.name, source=source)
+
+
+def succeed(job, file_path):
+    return {'success': True, 'attempts': 1}
+
+
+def test_budget_packs_smaller_documents_after_one_does_not_fit(tmp_path):
+    sizes = {'a': 3000, 'b': 1000, 'c': 5000, 'd': 500}
+    job = make_job(tmp_path, sizes)
+    budget = TokenBudget(daily_spend=0.005, cost_per_million_tokens=1.0)
+
+    remainder = JobScheduler(budget=budget).run([job], succeed, lambda j, f: sizes[f.name])
+
+    assert [job.files[i].name for _, i in remainder] == ['c']
+    assert [r is not None for r in job.results] == [True, True, False, True]
+    assert budget.spent_today == 0.0045
+
+
+def test_retries_are_charged_per_attempt(tmp_path):
+    job = make_job(tmp_path, ['a'])
+    budget = TokenBudget(daily_spend=1.0, cost_per_million_tokens=1.0)
+
+    JobScheduler(budget=budget).run([job], lambda j, f: {'success': False, 'attempts': 3}, lambda j, f: 1000)
+
+    assert budget.spent_today == 0.003
+
+
+def test_remainder_manifest_round_trip_keeps_settings(tmp_path):
+    job = make_job(tmp_path, ['a', 'b', 'c'], type='resume', dataset=str(tmp_path), deadline=None)
+    budget = TokenBudget(tokens_per_minute=10**6, daily_spend=0.002, cost_per_million_tokens=1.0)
+    scheduler = JobScheduler(max_workers=2, priority='type', type_order=['resume'], budget=budget)
+
+    remainder = scheduler.run([job], succeed, lambda j, f: 1000)
+    assert len(remainder) == 1
+
+    path = tmp_path / "remainder.json"
+    path.write_text(json.dumps(scheduler.remainder_manifest(remainder)))
+    manifest = json.loads(path.read_text())
+
+    assert manifest['workers'] == 2
+    assert manifest['priority'] == 'type'
+    assert manifest['type_priority'] == ['resume']
+    assert manifest['budget'] == {'tokens_per_minute': 10**6, 'daily_spend': 0.002, 'cost_per_million_tokens': 1.0}
+    assert manifest['jobs'] == [{'type': 'resume', 'dataset': str(tmp_path), 'files': [str(job.files[2])]}]
+
+    resumed = JobScheduler(
+        max_workers=manifest['workers'],
+        priority=manifest['priority'],
+        type_order=manifest['type_priority'],
+        budget=TokenBudget(**manifest['budget']),
+    )
+    assert resumed.budget.daily_spend == 0.002
+
+
+def test_type_priority_orders_across_jobs(tmp_path):
+    (tmp_path / "r").mkdir()
+    (tmp_path / "s").mkdir()
+    resumes = make_job(tmp_path / "r", ['r1', 'r2'])
+    receipts = make_job(tmp_path / "s", ['s1'], FakeType.SHOP_RECEIPT)
+    order = []
+
+    JobScheduler(priority='type', type_order=['shop_receipt']).run(
+        [resumes, receipts], lambda j, f: order.append(f.name) or {'success': True}
+    )
+
+    assert order == ['s1', 'r1', 'r2']
+
+
+def test_fifo_interleaves_jobs_round_robin(tmp_path):
+    (tmp_path / "r").mkdir()
+    (tmp_path / "s").mkdir()
+    resumes = make_job(tmp_path / "r", ['r1', 'r2', 'r3'])
+    receipts = make_job(tmp_path / "s", ['s1'], FakeType.SHOP_RECEIPT)
+    order = []
+
+    JobScheduler().run([resumes, receipts], lambda j, f: order.append(f.name) or {'success': True})
+
+    assert order == ['r1', 's1', 'r2', 'r3']
+
+
+def test_estimate_uses_image_tiles_and_prompt_length():
+    license_path = Path(__file__).parent.parent / "datasets" / "Drivers_license" / "generated_license_0.png"
+    # 1192x772 is 2x2 tiles of 258 tokens, plus 100 prompt tokens and the default 512 output tokens
+    assert estimate_document_tokens(license_path, "x" * 400) == 4 * 258 + 100 + 512
@@ -0,0 +1,68 @@
+import pytest
+
+from core.stream_parser import IncrementalJSONParser, StreamAbort
+from core.validator import DrivingLicense, Resume, ShopReceipt
+
+
+def feed_in_chunks(validator_class, text: str, size: int) -> IncrementalJSONParser:
+    parser = IncrementalJSONParser(validator_class)
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+    parser.close()
+    return parser
+
+
+FENCED_RESUME = (
+    '```json\n'
+    '{"full_name": "Jane Doe", "skills": ["Python"], "work_experience": null, '
+    '"education": [{"institution": "MIT", "degree": "BSc"}]}\n'
+    '```'
+)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, len(FENCED_RESUME)])
+def test_fenced_response_split_across_chunks(size):
+    parser = feed_in_chunks(Resume, FENCED_RESUME, size)
+    assert parser.fields_seen == 4
+    assert parser.first_field_time is not None
+
+
+def test_prose_preamble_aborts_on_first_chunk():
+    parser = IncrementalJSONParser(Resume)
+    with pytest.raises(StreamAbort, match="does not start with a JSON object"):
+        parser.feed("Sure")
+
+
+def test_wrong_value_type_aborts_before_the_object_ends():
+    parser = IncrementalJSONParser(Resume)
+    with pytest.raises(StreamAbort, match="'skills' of Resume expects a list"):
+        parser.feed('{"skills": "notalist", "full_name": 5}')
+    assert not parser._finished
+
+
+def test_number_for_string_field_aborts():
+    with pytest.raises(StreamAbort, match="'full_name' of Resume expects a str"):
+        feed_in_chunks(Resume, '{"full_name": 5}', 1)
+
+
+def test_missing_required_fields_abort_on_close():
+    with pytest.raises(StreamAbort, match="Missing required fields"):
+        feed_in_chunks(DrivingLicense, '{"name": "A"}', 4)
+
+
+def test_unknown_fields_are_allowed_when_extras_are_ignored():
+    feed_in_chunks(Resume, '{"full_name": "a", "extra": 1}', 2)
+
+
+def test_numeric_strings_and_nulls_are_accepted():
+    feed_in_chunks(ShopReceipt, '{"TotalAmount": "12.5", "MerchantName": null, "LineItems": []}', 3)
+
+
+def test_trailing_text_aborts():
+    with pytest.raises(StreamAbort, match="Unexpected text"):
+        feed_in_chunks(Resume, '{"full_name": "a"} thanks!', 5)
+
+
+def test_truncated_stream_aborts_on_close():
+    with pytest.raises(StreamAbort, match="before the JSON object was complete"):
+        feed_in_chunks(Resume, '{"full_name": "a"', 5)